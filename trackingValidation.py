@@ -5,14 +5,17 @@ _all_ = [ 'trackValidation.py' ]
 import os
 import numpy as np
 import uproot
-import awkward as ak
-import hist
 
-import matplotlib.pyplot as plt
 import matplotlib as mpl
-import mplhep as hep
+mpl.use('Agg')
+mpl.interactive(False)
+import matplotlib.pyplot as plt
 
-import collections
+import functools
+import hashlib
+import shutil
+from types import MappingProxyType
+from concurrent.futures import ProcessPoolExecutor, ThreadPoolExecutor, as_completed
 
 import argparse
 
@@ -20,36 +23,155 @@ def makedir(path):
     if not os.path.exists(path):
         os.makedirs(path)
 
+def getSavedir(tag, odir):
+    """Output directory of the plots: `odir` if given, else ./Plots_<tag>/."""
+    if odir:
+        return odir
+    return os.getcwd() + "/Plots_" + tag + "/"
+
+@functools.cache
+def _hep():
+    """Import mplhep on first use; it is only needed once plotting starts."""
+    import mplhep as hep
+    return hep
+
+@functools.lru_cache(maxsize=None)
+def _open(path):
+    """
+    Open each ROOT file once; the handle is shared by all validators.
+    Reads are bound by decompression: DQM files written with
+    compression=uproot.LZ4(1) instead of ZLIB read noticeably faster.
+    """
+    return uproot.open(path)
+
+def _read_histos(tdir, keys):
+    """Read all `keys` from `tdir` concurrently, returning {key: uproot TH1}."""
+    with ThreadPoolExecutor(8) as pool:
+        futures = {pool.submit(tdir.__getitem__, key): key for key in keys}
+        return {futures[f]: f.result() for f in as_completed(futures)}
+
+def _to_hists(v_h, savename):
+    """Convert the histograms of one plot, or return None if all of them are empty."""
+    if not any(h.values().sum() for h in v_h):
+        print(f"All histograms in {savename} are empty. Skipping plot.")
+        return None
+    return [h.to_hist() for h in v_h]
+
+def _files_signature(files):
+    """
+    Identify the input files by path, mtime, size and a hash of their first MB.
+    Returns None, i.e. no caching, if any of them is not a local file
+    (e.g. root:// or https:// URLs).
+    """
+    if not all(os.path.isfile(path) for path in files):
+        return None
+    sig = []
+    for path in files:
+        st = os.stat(path)
+        with open(path, 'rb') as f:
+            digest = hashlib.sha256(f.read(1 << 20)).hexdigest()
+        sig.append((os.path.abspath(path), st.st_mtime_ns, st.st_size, digest))
+    return tuple(sig)
+
+@functools.cache
+def _code_fingerprint():
+    """Identify this script and the plotting libraries, so cached plots expire when they change."""
+    with open(__file__, 'rb') as f:
+        source = f.read()
+    return (hashlib.blake2b(source).hexdigest(), mpl.__version__, _hep().__version__)
+
+def _cached_plot(plot):
+    """
+    Copy a plot from `self.cachedir` if it was already rendered from the same
+    input files with the same arguments, script and plotting library versions;
+    otherwise render it and store it.
+    """
+    @functools.wraps(plot)
+    def wrapper(self, v_h, savename, v_label, *args, files_sig=None, **kwargs):
+        if self.cachedir is None or files_sig is None:
+            return plot(self, v_h, savename, v_label, *args, **kwargs)
+
+        key = repr((_code_fingerprint(), files_sig, savename, tuple(v_label), args, sorted(kwargs.items())))
+        key = hashlib.blake2b(key.encode()).hexdigest()
+        cached = [os.path.join(self.cachedir, key + ext) for ext in self.extensions]
+        targets = [self.savedir + savename + ext for ext in self.extensions]
+
+        if all(os.path.exists(c) for c in cached):
+            for c, t in zip(cached, targets):
+                shutil.copy(c, t)
+            return
+
+        plot(self, v_h, savename, v_label, *args, **kwargs)
+        for c, t in zip(cached, targets):
+            if os.path.exists(t):
+                shutil.copy(t, c + ".tmp")
+                os.replace(c + ".tmp", c)
+    return wrapper
+
+class _H:
+    """
+    Plain NumPy arrays (edges, values, variances) of a 1D histogram.
+    Contents are kept in FP32, which is plenty for plotting ratios.
+    """
+    __slots__ = ('edges', 'v', 'var')
+
+    def __init__(self, h):
+        self.edges = h.axes[0].edges
+        self.v = np.asarray(h.values(), dtype=np.float32)
+        self.var = np.asarray(h.variances(), dtype=np.float32)
+
 class ValidPlotter:
-    def __init__(self, tag, odir):
+    def __init__(self, tag, odir, cachedir=None):
         self.markers = ("s", "v", "o", "x", "^")
         self.colors = ("blue", "orange", "green", "red", "purple")
+        self._tab10 = plt.cm.tab10.colors
         self.fontsize = 40
-        plt.rcParams.update({'font.size': 22})
-
-        if odir:
-            self.savedir = odir
-        else:
-            self.savedir = os.getcwd() + "/Plots_" + tag + "/"
+        plt.rcParams.update({'font.size': 22,
+                             'figure.autolayout': False,
+                             'path.simplify': True,
+                             'path.simplify_threshold': 1.0,
+                             'agg.path.chunksize': 10000})
+        _hep().style.use("CMS")
+
+        # Figures are built once and their axes cleared between plots
+        self._fig2, (self._ax1_r, self._ax2_r) = plt.subplots(2, 1, sharex=True, figsize=(20,16),
+                                                              gridspec_kw={'height_ratios': [3, 1]})
+        self._fig2.subplots_adjust(wspace=0, hspace=0.05)
+        self._fig1, self._ax1_s = plt.subplots(figsize=(20, 16))
+
+        self.savedir = getSavedir(tag, odir)
         makedir(os.path.join(self.savedir))
 
+        self.extensions = ('.png', '.pdf')
+        self.cachedir = cachedir
+        if cachedir:
+            makedir(cachedir)
+
     def _div(self, num, den):
-        """Ignore division by zero; they are correctly handled by the plot."""
-        with np.errstate(divide='ignore', invalid='ignore'):
-            ratio = num / den
-        return ratio
-
-    def ratioHist(self, num, den):
-        hratio = num.copy()
-        upvals, upvars = num.values(), num.variances()
-        dovals, dovars = den.values(), den.variances()
-        
-        hratio.values()[:] = self._div(upvals, dovals)
-        hratio.variances()[:] = np.abs(self._div(upvals, dovals))
-        hratio.variances()[:] *= np.sqrt(self._div(upvars, upvals)**2 +  self._div(dovars, dovals)**2)
+        """Masked division: bins with a zero denominator are set to 0."""
+        out = np.zeros_like(num, dtype=np.result_type(num, np.float32))
+        return np.divide(num, den, out=out, where=den!=0)
+
+    def ratioHist(self, num, den, hratio):
+        """Fill `hratio` in place with the ratio of the `_H` arrays `num` and `den`."""
+        upvals, upvars = num.v, num.var
+        dovals, dovars = den.v, den.var
+
+        ratio = self._div(upvals, dovals)
+        uperr = self._div(upvars, upvals)
+        doerr = self._div(dovars, dovals)
+        uperr *= uperr
+        doerr *= doerr
+        uperr += doerr
+        np.sqrt(uperr, out=uperr)
+        uperr *= np.abs(ratio)
+
+        hratio.values()[:] = ratio
+        hratio.variances()[:] = uperr
 
         return hratio
         
+    @_cached_plot
     def plotHistos(self, v_h,
                    savename,
                    v_label,
@@ -59,34 +181,32 @@ class ValidPlotter:
                    yscale=None):
         """Plot histograms."""
 
-        if all(float(sum(h.values())) == 0.0 for h in v_h):
-            print(f"All histograms in {savename} are empty. Skipping plot.")
-            return
-
-        # Create a figure
-        plt.close()
+        # Reuse the cached figure
         if len(v_h) > 1:
-            fig, (ax1, ax2) = plt.subplots(2, 1, sharex=True, figsize=(20,16),
-                                        gridspec_kw={'height_ratios': [3, 1]})
-            plt.subplots_adjust(wspace=0, hspace=0.05)        
+            fig, ax1, ax2 = self._fig2, self._ax1_r, self._ax2_r
+            ax1.cla()
+            ax2.cla()
+            ax1.tick_params(labelbottom=False)
+            ax2.tick_params(axis='x', which='major', reset=True)
         else:
-            fig, ax1 = plt.subplots(figsize=(20, 16))
+            fig, ax1 = self._fig1, self._ax1_s
+            ax1.cla()
             ax2 = None
 
-        colors = plt.cm.tab10.colors
+        cols = [self._tab10[i % len(self._tab10)] for i in range(len(v_h))]
         plot_args = dict(linewidth=4)
 
         # Plot the main histograms
         for idx, (h, label) in enumerate(zip(v_h, v_label)):
-            color = colors[idx % len(colors)]
-            h.plot(ax=ax1, label=label, color=color, **plot_args)
+            h.plot(ax=ax1, label=label, color=cols[idx], **plot_args)
 
-        # Plot ratios with respect to the first histogram
-        reference_hist = v_h[0]
-        for idx, h in enumerate(v_h[1:], start=1):
-            hratio = self.ratioHist(reference_hist, h)
-            color = colors[idx % len(colors)]
-            hratio.plot(ax=ax2, color=color, histtype='errorbar', markersize=0.5*self.fontsize, label=f"{v_label[idx]}/" + v_label[0])
+        # Plot ratios with respect to the first histogram, reusing a single template
+        if len(v_h) > 1:
+            v_arr = [_H(h) for h in v_h]
+            hratio = v_h[0].copy()
+        for idx in range(1, len(v_h)):
+            self.ratioHist(v_arr[0], v_arr[idx], hratio)
+            hratio.plot(ax=ax2, color=cols[idx], histtype='errorbar', markersize=0.5*self.fontsize, label=f"{v_label[idx]}/" + v_label[0])
 
         sizeargs = dict(fontsize=0.7*self.fontsize)
         ax1.set_ylabel(ylabel, loc="top", **sizeargs)
@@ -96,7 +216,7 @@ class ValidPlotter:
             ax2.set_ylabel('Ratio', **sizeargs)
             ax2.set_xlabel(xlabel, **sizeargs)
             ax2.set_ylim(ratio_ylim)
-            ax2.hlines(y=1., xmin=hratio.axes[0].edges[0], xmax=hratio.axes[0].edges[-1],
+            ax2.hlines(y=1., xmin=v_arr[0].edges[0], xmax=v_arr[0].edges[-1],
                     linewidth=2, linestyle='--', color='gray')
 
             if modify_ticks:
@@ -104,73 +224,71 @@ class ValidPlotter:
 
         ax1.legend()
 
+        hep = _hep()
         hep.cms.text(' Preliminary', fontsize=self.fontsize, ax=ax1)
         hep.cms.lumitext(title, fontsize=0.8*self.fontsize, ax=ax1)
-        hep.style.use("CMS")
-
-        for ext in ('.png', '.pdf'):
-            plt.savefig(self.savedir + "{}.png".format(savename))
-
-def getEfficiency(passing, total):
-    yEff = []
-    yEffErrUp = []
-    yEffErrLow = []
-    for yPass, yTot in zip(passing, total):
-        if yTot>0:
-            # error calculation with eff
-            result = binomtest(k=int(yPass), n=int(yTot))
-            yEff.append(result.statistic)
-            yEffErrLow.append(result.proportion_ci(0.683).low)
-            yEffErrUp.append(result.proportion_ci(0.683).high)
-        else:
-            yEff.append(0)
-            yEffErrLow.append(0)
-            yEffErrUp.append(0)
-    return np.array(yEff), np.array(yEffErrLow), np.array(yEffErrUp)
 
-def hgcalReleaseValidation(files, labels, tag, odir):
-    """
-    Produces the HGCAL validation comparison plots.
-    """
+        for ext in self.extensions:
+            fig.savefig(f"{self.savedir}{savename}{ext}", dpi=100, bbox_inches=None)
 
-    dqm_paths = {}
-    dqm_files = {}
+_worker_plotter = None
 
-    for file, label in zip(files, labels):
-        dqm_paths[label] = file
-        dqm_files[label] = uproot.open(file)["DQMData/Run 1/HLT/Run summary/HGCAL/HGCalValidator/hltTiclCandidate"]
+def _init_worker(tag, odir, cachedir):
+    global _worker_plotter
+    _worker_plotter = ValidPlotter(tag, odir, cachedir)
 
-    assert dqm_paths.keys() == dqm_files.keys()
-
-    hgcalCollections = {
-        "Electrons"           : "electrons", 
-        "Photons"             : "photons", 
-        "Muons"               : "muons", 
-        "Pi0"                 : "neutral_pions", 
-        "ChargedHadrons"      : "charged_hadrons", 
-        "NeutralHadrons"      : "neutral_hadrons", 
-    }
-
-    # Plot level 0 histograms
-    names_level0 = [ "Candidates PDG Id", "Candidates charge", "Candidates pT", 
-                     "Candidates raw energy", "Candidates regressed energy", "Candidates type",
-                     "N of tracksters in candidate"]
-
-    histos_level0 = collections.defaultdict(dict)
-    for release in dqm_paths.keys():
-        for name in names_level0:
-            histos_level0[release].update({name: dqm_files[release][name].to_hist()})
-
-    plotter = ValidPlotter(tag, odir)
-    for name in names_level0:
-        v_histos = [histos_level0[label][name] for label in dqm_paths.keys()]
-        v_labels = [label for label in dqm_paths.keys()]
-        plotter.plotHistos(v_h=v_histos,
-                           v_label=v_labels,
-                           modify_ticks=True,
-                           savename=name)
+def _plot_job(kwargs):
+    _worker_plotter.plotHistos(**kwargs)
 
-    # Plot nested histograms for each particle type
+def plotAll(jobs, tag, odir, cachedir=None):
+    """
+    Render every plot of `jobs` (plotHistos keyword arguments) in parallel,
+    with one ValidPlotter per worker process.
+    """
+    if not jobs:
+        return
+    # Workers are all started up front, so do not spawn more than needed or allowed
+    max_workers = min(len(jobs), len(os.sched_getaffinity(0)))
+    with ProcessPoolExecutor(max_workers=max_workers,
+                             initializer=_init_worker, initargs=(tag, odir, cachedir)) as pool:
+        list(pool.map(_plot_job, jobs))
+
+def getEfficiency(passing, total, cl=0.683):
+    """
+    Per-bin efficiency with its Clopper-Pearson interval (the default of
+    scipy's binomtest), computed on whole arrays. Empty bins are set to 0.
+    """
+    from scipy.special import betaincinv
+
+    total = np.trunc(np.asarray(total, dtype=np.float64))
+    valid = total > 0
+    k = np.where(valid, np.trunc(np.asarray(passing, dtype=np.float64)), 0.)
+    n = np.where(valid, total, 1.)
+    alpha = 0.5 * (1. - cl)
+
+    with np.errstate(all='ignore'):
+        yEff = np.where(valid, k / n, 0.)
+        yEffErrLow = np.where(k > 0, betaincinv(k, n - k + 1, alpha), 0.)
+        yEffErrUp = np.where(k < n, betaincinv(k + 1, n - k, 1. - alpha), 1.)
+    yEffErrUp[~valid] = 0.
+    return yEff, yEffErrLow, yEffErrUp
+
+_HGCAL_COLLECTIONS = MappingProxyType({
+    "Electrons"           : "electrons",
+    "Photons"             : "photons",
+    "Muons"               : "muons",
+    "Pi0"                 : "neutral_pions",
+    "ChargedHadrons"      : "charged_hadrons",
+    "NeutralHadrons"      : "neutral_hadrons",
+})
+
+# Level 0 histograms
+_HGCAL_NAMES_LEVEL0 = ( "Candidates PDG Id", "Candidates charge", "Candidates pT",
+                        "Candidates raw energy", "Candidates regressed energy", "Candidates type",
+                        "N of tracksters in candidate" )
+
+def _hgcal_names_nested():
+    """Build the read-only {collection: {histogram name: (ylabel, xlabel)}} table."""
     axes = {
         "energy": "E (GeV)",
         "pt": r"p$_{\text{T}}$",
@@ -182,51 +300,115 @@ def hgcalReleaseValidation(files, labels, tag, odir):
         "fake": "Fake Rate",
     }
 
+    # Share one (ylabel, xlabel) tuple between all names with the same labels
+    axes_cache = {}
     names_nested = {}
-    for coll in hgcalCollections.values():
+    for coll in _HGCAL_COLLECTIONS.values():
         names_nested_coll = {}
 
         for metric, ylabel in metrics.items():
             for step in ["energy", "pid"]:
                 for axis, xlabel in axes.items():
-                    names_nested_coll[f"{metric}_{coll}_{step}_{axis}"] = (ylabel, xlabel)
+                    names_nested_coll[f"{metric}_{coll}_{step}_{axis}"] = axes_cache.setdefault((ylabel, xlabel), (ylabel, xlabel))
             # Only include "track" variables for charged particles
             if coll in ["electrons", "muons", "charged_hadrons"]:
                 for axis, xlabel in axes.items():
-                    names_nested_coll[f"{metric}_{coll}_track_{axis}"] = (ylabel, xlabel)
-        
-        names_nested[coll] = names_nested_coll
+                    names_nested_coll[f"{metric}_{coll}_track_{axis}"] = axes_cache.setdefault((ylabel, xlabel), (ylabel, xlabel))
+
+        names_nested[coll] = MappingProxyType(names_nested_coll)
+    return MappingProxyType(names_nested)
+
+# Nested histograms for each particle type, built once at import
+_HGCAL_NAMES_NESTED = _hgcal_names_nested()
+
+def hgcalReleaseValidation(files, labels, tag, odir, cachedir=None):
+    """
+    Produces the HGCAL validation comparison plots.
+    """
+    plotAll(hgcalValidationJobs(files, labels, getSavedir(tag, odir), cachedir), tag, odir, cachedir)
+
+def hgcalValidationJobs(files, labels, savedir, cachedir=None):
+    """
+    Reads the HGCAL validation histograms and returns the plotHistos
+    arguments of every comparison plot.
+    """
+
+    dqm_paths = {}
+    dqm_files = {}
+
+    for file, label in zip(files, labels):
+        dqm_paths[label] = file
+        dqm_files[label] = _open(file)["DQMData/Run 1/HLT/Run summary/HGCAL/HGCalValidator/hltTiclCandidate"]
 
-    histos_nested = collections.defaultdict(lambda: collections.defaultdict(dict))
+    assert dqm_paths.keys() == dqm_files.keys()
+
+    hgcalCollections = _HGCAL_COLLECTIONS
+    names_level0 = _HGCAL_NAMES_LEVEL0
+    names_nested = _HGCAL_NAMES_NESTED
+
+    # Read every histogram of a release in a single concurrent batch
+    histos_level0 = {}
+    histos_nested = {}
     for release in dqm_paths.keys():
+        keys = list(names_level0) + [f"{coll}/{name}" for coll in hgcalCollections.values()
+                                     for name in names_nested[coll]]
+        histos = _read_histos(dqm_files[release], keys)
+        for name in names_level0:
+            histos_level0[(release, name)] = histos[name]
         for coll in hgcalCollections.values():
             for name in names_nested[coll]:
-                histos_nested[release][coll].update({name: dqm_files[release][coll][name].to_hist()})
+                histos_nested[(release, coll, name)] = histos[f"{coll}/{name}"]
+
+    files_sig = _files_signature(files) if cachedir else None
+    jobs = []
+    for name in names_level0:
+        v_histos = _to_hists([histos_level0[(label, name)] for label in dqm_paths.keys()], name)
+        if v_histos is None:
+            continue
+        v_labels = [label for label in dqm_paths.keys()]
+        jobs.append(dict(v_h=v_histos,
+                         v_label=v_labels,
+                         modify_ticks=True,
+                         savename=name,
+                         files_sig=files_sig))
 
     for coll in hgcalCollections.values():
-        makedir(os.path.join(plotter.savedir, coll))
+        makedir(os.path.join(savedir, coll))
         for name, labels in names_nested[coll].items():
-            v_histos = [histos_nested[label][coll][name] for label in dqm_paths.keys()]
+            v_histos = _to_hists([histos_nested[(label, coll, name)] for label in dqm_paths.keys()],
+                                 coll + '/' + name)
+            if v_histos is None:
+                continue
             v_labels = [label for label in dqm_paths.keys()]
-            plotter.plotHistos(v_h=v_histos,
-                               v_label=v_labels,
-                               ylabel=labels[0],
-                               xlabel=labels[1],
-                               title=coll,
-                               savename=coll + '/' + name)
+            jobs.append(dict(v_h=v_histos,
+                             v_label=v_labels,
+                             ylabel=labels[0],
+                             xlabel=labels[1],
+                             title=coll,
+                             savename=coll + '/' + name,
+                             files_sig=files_sig))
+
+    return jobs
 
 
-def trackReleaseValidation(files, labels, tag, odir):
+def trackReleaseValidation(files, labels, tag, odir, cachedir=None):
     """
     Produces the tracking validation comparison plots.
     """
+    plotAll(trackValidationJobs(files, labels, getSavedir(tag, odir), cachedir), tag, odir, cachedir)
+
+def trackValidationJobs(files, labels, savedir, cachedir=None):
+    """
+    Reads the tracking validation histograms and returns the plotHistos
+    arguments of every comparison plot.
+    """
 
     dqm_paths = {}
     dqm_files = {}
 
     for file, label in zip(files, labels):
         dqm_paths[label] = file
-        dqm_files[label] = uproot.open(file)["DQMData/Run 1/HLT/Run summary/Tracking/ValidationWRTtp"]
+        dqm_files[label] = _open(file)["DQMData/Run 1/HLT/Run summary/Tracking/ValidationWRTtp"]
 
     assert dqm_paths.keys() == dqm_files.keys()
 
@@ -243,20 +425,6 @@ def trackReleaseValidation(files, labels, tag, odir):
                      "fakerate_vs_coll", "pileuprate_coll",
                      "num_assoc(simToReco)_coll", "num_assoc(recoToSim)_coll" ]
 
-    histos_level0 = collections.defaultdict(dict)
-    for label in dqm_paths.keys():
-        for name in names_level0:
-            histos_level0[label].update({name: dqm_files[label][name].to_hist()})
-
-    plotter = ValidPlotter(tag, odir)
-    for name in names_level0:
-        v_histos = [histos_level0[label][name] for label in dqm_paths.keys()]
-        v_labels = [label for label in dqm_paths.keys()]
-        plotter.plotHistos(v_h=v_histos,
-                           v_label=v_labels,
-                           modify_ticks=True,
-                           savename=name)
-
     pt_str = r"p$_{\text{T}}$"
     eta_str = r"$\eta$"
     phi_str = r"$\phi$"
@@ -281,23 +449,49 @@ def trackReleaseValidation(files, labels, tag, odir):
         "duplicatesRate_Pt"  : ("Duplicate Rate", pt_str)
     }
 
-    histos_nested = collections.defaultdict(lambda: collections.defaultdict(dict))
+    # Read every histogram of a release in a single concurrent batch
+    histos_level0 = {}
+    histos_nested = {}
     for label in dqm_paths.keys():
+        keys = names_level0 + [f"{coll}/{name}" for coll in trackCollections.values()
+                               for name in names_nested]
+        histos = _read_histos(dqm_files[label], keys)
+        for name in names_level0:
+            histos_level0[(label, name)] = histos[name]
         for coll in trackCollections.values():
             for name in names_nested:
-                histos_nested[label][coll].update({name: dqm_files[label][coll][name].to_hist()})
+                histos_nested[(label, coll, name)] = histos[f"{coll}/{name}"]
+
+    files_sig = _files_signature(files) if cachedir else None
+    jobs = []
+    for name in names_level0:
+        v_histos = _to_hists([histos_level0[(label, name)] for label in dqm_paths.keys()], name)
+        if v_histos is None:
+            continue
+        v_labels = [label for label in dqm_paths.keys()]
+        jobs.append(dict(v_h=v_histos,
+                         v_label=v_labels,
+                         modify_ticks=True,
+                         savename=name,
+                         files_sig=files_sig))
 
     for coll in trackCollections.values():
-        makedir(os.path.join(plotter.savedir, coll))
+        makedir(os.path.join(savedir, coll))
         for name, labels in names_nested.items():
-            v_histos = [histos_nested[label][coll][name] for label in dqm_paths.keys()]
+            v_histos = _to_hists([histos_nested[(label, coll, name)] for label in dqm_paths.keys()],
+                                 coll + '/' + name)
+            if v_histos is None:
+                continue
             v_labels = [label for label in dqm_paths.keys()]
-            plotter.plotHistos(v_h=v_histos,
-                               v_label=v_labels,
-                               ylabel=labels[0],
-                               xlabel=labels[1],
-                               title=coll,
-                               savename=coll + '/' + name)
+            jobs.append(dict(v_h=v_histos,
+                             v_label=v_labels,
+                             ylabel=labels[0],
+                             xlabel=labels[1],
+                             title=coll,
+                             savename=coll + '/' + name,
+                             files_sig=files_sig))
+
+    return jobs
             
 if __name__ == '__main__':
     parser = argparse.ArgumentParser(description='Make track validation plots.')
@@ -305,6 +499,7 @@ if __name__ == '__main__':
     parser.add_argument('--labels', type=str, required=False, help='Comma-separated list of labels for the legend.')
     parser.add_argument('--tag', type=str, default=None, required=True, help='Tag to uniquely identify the plots.')
     parser.add_argument('--odir', type=str, required=False, help='Path to the output directory (if not specified, save to current directory).')
+    parser.add_argument('--cachedir', type=str, required=False, help='Directory where rendered plots are cached across runs (if not specified, no caching). Entries are keyed on the input files, plot settings, this script and the matplotlib/mplhep versions; clear it after any other environment change (e.g. fonts).')
     # parser.add_argument('--year', type=str, required=True,
     #                     choices=['2016', '2016APV', '2017', '2018'], help='Year')
     # parser.add_argument('--rebin', type=int, required=False, help="Rebin factor, leading to less bins.", default=1)
@@ -321,5 +516,8 @@ if __name__ == '__main__':
     
     assert len(files) == len(labels), "Number of files and labels must match."
 
-    trackReleaseValidation(files=files, labels=labels, tag=args.tag, odir=args.odir)
-    hgcalReleaseValidation(files=files, labels=labels, tag=args.tag, odir=args.odir)
+    # Render the plots of both validations in a single worker pool
+    savedir = getSavedir(args.tag, args.odir)
+    jobs = trackValidationJobs(files=files, labels=labels, savedir=savedir, cachedir=args.cachedir)
+    jobs += hgcalValidationJobs(files=files, labels=labels, savedir=savedir, cachedir=args.cachedir)
+    plotAll(jobs, tag=args.tag, odir=args.odir, cachedir=args.cachedir)